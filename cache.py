@@ -0,0 +1,73 @@
+"""
+Response Cache Helpers
+
+Redis-backed cache for rarely-changing public GET responses.
+Caching is disabled when REDIS_URL is not set, and Redis errors never fail a request.
+
+Every key is written with a TTL, so the Redis behind REDIS_URL should be configured
+with `maxmemory-policy volatile-lfu` (or `allkeys-lfu` if it holds nothing else).
+The policy is deployment config and is not changed from here.
+"""
+
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+import redis.asyncio as redis
+
+from config import settings
+
+redis_url = settings().redis_url
+
+# Fresh entries expire after the endpoint TTL; the stale copy is kept longer so
+# a listing can still be served when MongoDB is erroring.
+STALE_TTL_FACTOR = 30
+
+_redis = None
+
+def init_cache():
+    """Create the Redis client once; must be called from inside the running event loop"""
+    global _redis
+    if _redis is None and redis_url:
+        _redis = redis.Redis.from_url(redis_url)
+    return _redis
+
+async def close_cache():
+    """Close the Redis client created by init_cache"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+    _redis = None
+
+def cache_key(path: str, **params: Any) -> str:
+    """Key a response by path and its validated parameters, so unknown or oddly spelled query args share an entry"""
+    return f"cache:{path}?{urlencode(sorted(params.items()))}"
+
+async def cache_get(key: str) -> Optional[bytes]:
+    """Return a fresh cached body, or None on miss"""
+    if _redis is None:
+        return None
+    try:
+        return await _redis.get(key)
+    except redis.RedisError:
+        return None
+
+async def cache_get_stale(key: str) -> Optional[bytes]:
+    """Return the last known body even if its fresh TTL has passed"""
+    if _redis is None:
+        return None
+    try:
+        return await _redis.get(f"{key}:stale")
+    except redis.RedisError:
+        return None
+
+async def cache_set(key: str, body: bytes, ttl: int):
+    """Store a body for `ttl` seconds plus a longer-lived stale copy"""
+    if _redis is None:
+        return
+    try:
+        async with _redis.pipeline(transaction=False) as pipe:
+            pipe.setex(key, ttl, body)
+            pipe.setex(f"{key}:stale", ttl * STALE_TTL_FACTOR, body)
+            await pipe.execute()
+    except redis.RedisError:
+        pass
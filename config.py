@@ -0,0 +1,53 @@
+"""
+Application Settings
+
+Environment variables are read and parsed once into a frozen Settings object.
+Import `settings()` instead of calling os.getenv at request time.
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+def _flag(value: Optional[str]) -> bool:
+    return (value or "").lower() in ("1", "true", "yes")
+
+def _default_workers() -> int:
+    # One process per core plus headroom for I/O waits
+    return max((os.cpu_count() or 1) * 2 + 1, 2)
+
+@dataclass(frozen=True)
+class Settings:
+    database_url: Optional[str]
+    database_name: Optional[str]
+    mongo_max_pool: int
+    mongo_min_pool: int
+    redis_url: Optional[str]
+    intake_redis_url: Optional[str]
+    allowed_origins: Tuple[str, ...]
+    strict_email_validation: bool
+    port: int
+    workers: int
+
+@lru_cache
+def settings() -> Settings:
+    """Resolve settings from the environment on first use"""
+    return Settings(
+        database_url=os.getenv("DATABASE_URL"),
+        database_name=os.getenv("DATABASE_NAME"),
+        mongo_max_pool=int(os.getenv("MONGO_MAX_POOL", 200)),
+        mongo_min_pool=int(os.getenv("MONGO_MIN_POOL", 10)),
+        redis_url=os.getenv("REDIS_URL"),
+        intake_redis_url=os.getenv("INTAKE_REDIS_URL"),
+        # Comma-separated allowlist, e.g. "https://caprecon.org,https://www.caprecon.org"; unset keeps "*"
+        allowed_origins=tuple(o.strip() for o in os.getenv("ALLOWED_ORIGINS", "*").split(",") if o.strip()),
+        strict_email_validation=_flag(os.getenv("STRICT_EMAIL_VALIDATION")),
+        port=int(os.getenv("PORT", 8000)),
+        workers=int(os.getenv("WEB_CONCURRENCY") or os.getenv("WORKERS") or _default_workers()),
+    )
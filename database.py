@@ -6,50 +6,138 @@ Import and use these functions in your API endpoints for database operations.
 """
 
 from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
-import os
-from dotenv import load_dotenv
-from typing import Union
+from typing import Callable, Dict, List, Union
 from pydantic import BaseModel
 
-# Load environment variables from .env file
-load_dotenv()
+from config import settings
 
 _client = None
 db = None
+_async_client = None
+async_db = None
 
-database_url = os.getenv("DATABASE_URL")
-database_name = os.getenv("DATABASE_NAME")
+database_url = settings().database_url
+database_name = settings().database_name
+
+# Pool limits shared by the PyMongo and Motor clients
+client_options = {
+    "maxPoolSize": settings().mongo_max_pool,
+    "maxIdleTimeMS": 300_000,
+    "serverSelectionTimeoutMS": 2000,
+    "retryWrites": True,
+}
 
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    _client = MongoClient(database_url, **client_options)
     db = _client[database_name]
 
-# Helper functions for common database operations
-def create_document(collection_name: str, data: Union[BaseModel, dict]):
-    """Insert a single document with timestamp"""
-    if db is None:
-        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+def init_async_db():
+    """Create the Motor client once; must be called from inside the running event loop"""
+    global _async_client, async_db
+    if _async_client is None and database_url and database_name:
+        # Only the Motor client serves requests, so only it keeps warm connections;
+        # the sync client exists in every worker for scripts and stays idle
+        _async_client = AsyncIOMotorClient(database_url, minPoolSize=settings().mongo_min_pool, **client_options)
+        async_db = _async_client[database_name]
+    return async_db
+
+def close_async_db():
+    """Close the Motor client created by init_async_db"""
+    global _async_client, async_db
+    if _async_client is not None:
+        _async_client.close()
+    _async_client = None
+    async_db = None
+
+# Bound SchemaSerializer.to_python per model class, so dumping skips the model_dump wrapper
+_serializers: Dict[type, Callable] = {}
+
+def model_to_dict(model: BaseModel) -> dict:
+    """Dump a Pydantic model to a Mongo-ready dict, omitting None fields"""
+    cls = type(model)
+    to_python = _serializers.get(cls)
+    if to_python is None:
+        to_python = _serializers[cls] = cls.__pydantic_serializer__.to_python
+    return to_python(model, exclude_none=True, by_alias=True)
 
+def _prepare_document(data: Union[BaseModel, dict]) -> dict:
+    """Convert to a plain dict and stamp created/updated timestamps unless already set"""
     # Convert Pydantic model to dict if needed
     if isinstance(data, BaseModel):
-        data_dict = data.model_dump()
+        data_dict = model_to_dict(data)
     else:
         data_dict = data.copy()
 
-    data_dict['created_at'] = datetime.now(timezone.utc)
-    data_dict['updated_at'] = datetime.now(timezone.utc)
+    # Queued intake forms arrive already stamped with their submission time
+    data_dict.setdefault('created_at', datetime.now(timezone.utc))
+    data_dict.setdefault('updated_at', data_dict['created_at'])
+    return data_dict
 
-    result = db[collection_name].insert_one(data_dict)
+# Helper functions for common database operations
+def create_document(collection_name: str, data: Union[BaseModel, dict]):
+    """Insert a single document with timestamp"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    result = db[collection_name].insert_one(_prepare_document(data))
     return str(result.inserted_id)
 
-def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
+def create_documents(collection_name: str, items: List[Union[BaseModel, dict]]):
+    """Insert many documents with timestamps in a single round-trip"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    result = db[collection_name].insert_many([_prepare_document(i) for i in items], ordered=False)
+    return [str(i) for i in result.inserted_ids]
+
+def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None, projection: dict = None, sort: list = None):
     """Get documents from collection"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
     
-    cursor = db[collection_name].find(filter_dict or {})
+    cursor = db[collection_name].find(filter_dict or {}, projection)
+    if sort:
+        cursor = cursor.sort(sort)
     if limit:
         cursor = cursor.limit(limit)
     
     return list(cursor)
+
+# Async (Motor) variants for use inside `async def` endpoints
+async def create_document_async(collection_name: str, data: Union[BaseModel, dict]):
+    """Insert a single document with timestamp without blocking the event loop"""
+    if async_db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    result = await async_db[collection_name].insert_one(_prepare_document(data))
+    return str(result.inserted_id)
+
+async def create_documents_async(collection_name: str, items: List[Union[BaseModel, dict]]):
+    """Insert many documents with timestamps in a single round-trip without blocking the event loop"""
+    if async_db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    result = await async_db[collection_name].insert_many([_prepare_document(i) for i in items], ordered=False)
+    return [str(i) for i in result.inserted_ids]
+
+async def get_documents_async(collection_name: str, filter_dict: dict = None, limit: int = None, projection: dict = None, sort: list = None):
+    """Get documents from collection without blocking the event loop"""
+    if async_db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    cursor = async_db[collection_name].find(filter_dict or {}, projection)
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+
+    return await cursor.to_list(limit or None)
+
+async def create_index_async(collection_name: str, keys: list):
+    """Create an index if it does not already exist and return its name"""
+    if async_db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    return await async_db[collection_name].create_index(keys)
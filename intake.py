@@ -0,0 +1,255 @@
+"""
+Intake Write-Behind Queue
+
+Validated intake forms are pushed onto Redis lists and acknowledged immediately;
+a background task drains them into MongoDB in batches.
+Without INTAKE_REDIS_URL, forms are written to MongoDB directly.
+
+The queue must not share the response cache's Redis: queued forms have already been
+acknowledged, so the instance behind INTAKE_REDIS_URL has to run with
+`maxmemory-policy noeviction`, where a full Redis rejects LPUSH (and the form falls
+back to a direct write) instead of silently evicting queued forms.
+
+A batch is moved atomically from `intake:<kind>` onto the worker's own
+`intake:<kind>:processing:<worker>` list and only dropped once MongoDB has it, so a
+killed worker loses nothing: workers refresh a heartbeat key, and processing lists
+whose owner's heartbeat expired are moved back onto the queue. Queued forms carry a
+uuid `_id`, so replaying a batch that already reached MongoDB only yields duplicate
+key errors, which are skipped. Forms MongoDB keeps rejecting are moved to
+`intake:<kind>:failed` after MAX_ATTEMPTS tries.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+import orjson
+import redis.asyncio as redis
+import xxhash
+from pydantic import BaseModel
+from pymongo.errors import BulkWriteError, ConnectionFailure
+
+from config import settings
+from database import create_document_async, create_documents_async, model_to_dict
+
+logger = logging.getLogger(__name__)
+
+INTAKE_COLLECTIONS = ("donationintent", "volunteerapplication", "partnerinquiry", "contactmessage")
+DRAIN_BATCH_SIZE = 100
+DRAIN_INTERVAL = 0.2  # seconds between drain rounds when no queue had a full batch
+MAX_BACKOFF = 30.0  # upper bound on the pause after a round with failed writes
+MAX_ATTEMPTS = 5  # rejections before a form is dead-lettered
+HEARTBEAT_INTERVAL = 10
+HEARTBEAT_TTL = 60  # must outlast the longest pause between heartbeats (MAX_BACKOFF plus a write)
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Move up to ARGV[1] of the oldest forms onto the processing list, unless it still holds
+# a batch whose outcome couldn't be recorded; that batch is handed out again instead.
+_CLAIM_SCRIPT = """
+local pending = redis.call('LRANGE', KEYS[2], 0, -1)
+if #pending > 0 then
+    return pending
+end
+local items = redis.call('LRANGE', KEYS[1], -tonumber(ARGV[1]), -1)
+if #items > 0 then
+    redis.call('LTRIM', KEYS[1], 0, -#items - 1)
+    redis.call('RPUSH', KEYS[2], unpack(items))
+end
+return items
+"""
+
+# Put a whole processing list back on the consuming end of its queue, oldest last
+_RELEASE_SCRIPT = """
+local items = redis.call('LRANGE', KEYS[1], 0, -1)
+if #items > 0 then
+    redis.call('RPUSH', KEYS[2], unpack(items))
+end
+redis.call('DEL', KEYS[1])
+return #items
+"""
+
+_redis = None
+_worker: Optional[asyncio.Task] = None
+_worker_id: Optional[str] = None
+
+def _queue_key(collection_name: str) -> str:
+    return f"intake:{collection_name}"
+
+def _processing_key(collection_name: str, worker_id: str) -> str:
+    return f"intake:{collection_name}:processing:{worker_id}"
+
+def _failed_key(collection_name: str) -> str:
+    return f"intake:{collection_name}:failed"
+
+def _attempts_key(collection_name: str) -> str:
+    return f"intake:{collection_name}:attempts"
+
+def _heartbeat_key(worker_id: str) -> str:
+    return f"intake:worker:{worker_id}"
+
+def _load(item: bytes) -> dict:
+    """Decode a queued form; orjson writes datetimes as ISO 8601 strings"""
+    doc = orjson.loads(item)
+    doc["created_at"] = datetime.fromisoformat(doc["created_at"])
+    return doc
+
+async def submit_intake(collection_name: str, data: BaseModel) -> str:
+    """Queue a form for insertion and return its id, writing directly when no queue is configured"""
+    if _redis is None:
+        return await create_document_async(collection_name, data)
+    # Queued forms get their id up front so the client can be answered before the insert,
+    # and are stamped now rather than when they are drained
+    doc = {"_id": uuid4().hex, **model_to_dict(data), "created_at": datetime.now(timezone.utc)}
+    try:
+        await _redis.lpush(_queue_key(collection_name), orjson.dumps(doc))
+    except redis.RedisError as e:
+        logger.warning("Intake queue unavailable, writing %s directly: %s", collection_name, e)
+        # Keep the uuid: if the LPUSH did land, the drained copy collides instead of duplicating
+        return await create_document_async(collection_name, doc)
+    return doc["_id"]
+
+async def _settle(collection_name: str, items: List[bytes], done: List[bytes] = (), retry: List[bytes] = (), rejected: List[bytes] = ()):
+    """Record a batch's outcome and clear this worker's processing list in one transaction"""
+    attempts_key = _attempts_key(collection_name)
+    try:
+        dead = []
+        if rejected:
+            async with _redis.pipeline(transaction=False) as pipe:
+                for item in rejected:
+                    pipe.hincrby(attempts_key, xxhash.xxh3_64_hexdigest(item), 1)
+                counts = await pipe.execute()
+            dead = [item for item, n in zip(rejected, counts) if n >= MAX_ATTEMPTS]
+            retry = [*retry, *(item for item, n in zip(rejected, counts) if n < MAX_ATTEMPTS)]
+            if dead:
+                logger.error("Moving %d intake forms to %s after %d failed attempts", len(dead), _failed_key(collection_name), MAX_ATTEMPTS)
+        # Keep the processing list's order (oldest last) when putting forms back on the queue
+        retry_set = set(retry)
+        retry = [item for item in items if item in retry_set]
+        finished = [*done, *dead]
+        async with _redis.pipeline(transaction=True) as pipe:
+            if retry:
+                pipe.rpush(_queue_key(collection_name), *retry)
+            if dead:
+                pipe.lpush(_failed_key(collection_name), *dead)
+            if finished:
+                pipe.hdel(attempts_key, *(xxhash.xxh3_64_hexdigest(item) for item in finished))
+            pipe.delete(_processing_key(collection_name, _worker_id))
+            await pipe.execute()
+    except redis.RedisError as e:
+        # The batch stays on the processing list and is handed out again by the next claim
+        logger.warning("Could not record intake batch for %s: %s", collection_name, e)
+
+async def _drain(collection_name: str) -> Tuple[int, bool]:
+    """Move up to one batch from a queue into MongoDB; returns (forms taken, whether all writes succeeded)"""
+    processing_key = _processing_key(collection_name, _worker_id)
+    try:
+        items = await _redis.eval(_CLAIM_SCRIPT, 2, _queue_key(collection_name), processing_key, DRAIN_BATCH_SIZE)
+    except redis.RedisError as e:
+        logger.warning("Could not read intake queue %s: %s", collection_name, e)
+        return 0, False
+    if not items:
+        return 0, True
+    try:
+        await create_documents_async(collection_name, [_load(i) for i in items])
+    except asyncio.CancelledError:
+        try:
+            await _redis.eval(_RELEASE_SCRIPT, 2, processing_key, _queue_key(collection_name))
+        except redis.RedisError:
+            # Left on the processing list; recovered once this worker's heartbeat is gone
+            pass
+        raise
+    except BulkWriteError as e:
+        # Duplicates are forms an earlier attempt already stored
+        errors = [err for err in e.details["writeErrors"] if err["code"] != DUPLICATE_KEY_ERROR]
+        if not errors:
+            await _settle(collection_name, items, done=items)
+            return len(items), True
+        failed = {err["index"] for err in errors}
+        logger.warning("Intake write to %s rejected %d forms: %s", collection_name, len(failed), errors[0]["errmsg"])
+        await _settle(
+            collection_name,
+            items,
+            done=[item for i, item in enumerate(items) if i not in failed],
+            rejected=[items[i] for i in failed],
+        )
+        return len(items), False
+    except ConnectionFailure as e:
+        # MongoDB is unreachable; nothing is wrong with the forms, so retry without counting
+        logger.warning("Intake write to %s failed, re-queueing %d forms: %s", collection_name, len(items), e)
+        await _settle(collection_name, items, retry=items)
+        return 0, False
+    except Exception as e:
+        logger.warning("Intake write to %s failed for %d forms: %s", collection_name, len(items), e)
+        await _settle(collection_name, items, rejected=items)
+        return 0, False
+    await _settle(collection_name, items, done=items)
+    return len(items), True
+
+async def _recover_orphans():
+    """Refresh this worker's heartbeat and requeue batches held by workers whose heartbeat expired"""
+    await _redis.set(_heartbeat_key(_worker_id), 1, ex=HEARTBEAT_TTL)
+    async for key in _redis.scan_iter(match="intake:*:processing:*"):
+        _, collection_name, _, worker_id = key.decode().split(":")
+        if worker_id == _worker_id or await _redis.exists(_heartbeat_key(worker_id)):
+            continue
+        moved = await _redis.eval(_RELEASE_SCRIPT, 2, key, _queue_key(collection_name))
+        if moved:
+            logger.warning("Re-queued %d intake forms for %s left by worker %s", moved, collection_name, worker_id)
+
+async def _drain_forever():
+    loop = asyncio.get_running_loop()
+    next_heartbeat = 0.0
+    backoff = DRAIN_INTERVAL
+    while True:
+        if loop.time() >= next_heartbeat:
+            try:
+                await _recover_orphans()
+            except redis.RedisError as e:
+                logger.warning("Could not refresh intake worker heartbeat: %s", e)
+            next_heartbeat = loop.time() + HEARTBEAT_INTERVAL
+        full_batch = False
+        all_ok = True
+        for collection_name in INTAKE_COLLECTIONS:
+            taken, ok = await _drain(collection_name)
+            full_batch |= taken == DRAIN_BATCH_SIZE
+            all_ok &= ok
+        if not all_ok:
+            # Back off while MongoDB or Redis is failing instead of retrying every interval
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+            continue
+        backoff = DRAIN_INTERVAL
+        if not full_batch:
+            await asyncio.sleep(DRAIN_INTERVAL)
+
+def start_intake_worker() -> Optional[asyncio.Task]:
+    """Connect to the intake Redis and start the drain task; must be called from inside the running event loop"""
+    global _redis, _worker, _worker_id
+    if settings().intake_redis_url and _worker is None:
+        _redis = redis.Redis.from_url(settings().intake_redis_url)
+        _worker_id = uuid4().hex
+        _worker = asyncio.create_task(_drain_forever())
+    return _worker
+
+async def stop_intake_worker():
+    """Stop queueing new forms, cancel the drain task and close the intake Redis; queued forms stay in Redis"""
+    global _redis, _worker, _worker_id
+    if _worker is not None:
+        # The drain task releases its in-flight batch on cancellation, so it needs the client until it exits
+        _worker.cancel()
+        try:
+            await _worker
+        except asyncio.CancelledError:
+            pass
+    _worker = None
+    if _redis is not None:
+        try:
+            await _redis.delete(_heartbeat_key(_worker_id))
+        except redis.RedisError:
+            pass
+        await _redis.aclose()
+    _redis = None
+    _worker_id = None
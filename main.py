@@ -1,10 +1,26 @@
-import os
-from fastapi import FastAPI, HTTPException
+import time
+import asyncio
+import logging
+
+import orjson
+import xxhash
+from fastapi import Body, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+from typing import Annotated, List, Optional, Type
 
-from database import create_document, get_documents, db
+from config import settings
+from cache import init_cache, close_cache, cache_key, cache_get, cache_get_stale, cache_set
+from database import (
+    create_documents_async,
+    create_index_async,
+    get_documents_async,
+    init_async_db,
+    close_async_db,
+)
+from intake import start_intake_worker, stop_intake_worker, submit_intake
 from schemas import (
     Program,
     Story,
@@ -15,27 +31,66 @@ from schemas import (
     ContactMessage,
 )
 
-app = FastAPI(title="Caprecon NGO API", version="0.1.0")
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="Caprecon NGO API", version="0.1.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=settings().allowed_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=("GET", "POST"),
+    allow_headers=("Content-Type", "Authorization"),
+    max_age=86400,
 )
 
+# Multi-KB listing bodies compress well; small intake responses stay below the threshold
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
+
+@app.on_event("startup")
+async def open_connections():
+    # Motor and redis.asyncio bind to the running loop, so clients are created here rather than at import
+    app.state.mongo = init_async_db()
+    app.state.redis = init_cache()
+    if app.state.mongo is not None:
+        for collection_name in LISTING_COLLECTIONS:
+            try:
+                await create_index_async(collection_name, PUBLISHED_INDEX)
+            except Exception as e:
+                # Listings still work without the index, just slower
+                logger.warning("Could not create %s index on %s: %s", PUBLISHED_INDEX, collection_name, e)
+        # Intake forms are acknowledged once queued in Redis and written to MongoDB in the background
+        app.state.intake_worker = start_intake_worker()
+
+@app.on_event("shutdown")
+async def close_connections():
+    await stop_intake_worker()
+    close_async_db()
+    await close_cache()
+
+# Constant bodies are encoded once; liveness probes hit these hard
+_ROOT = orjson.dumps({"message": "Caprecon Backend Running"})
+_HELLO = orjson.dumps({"message": "Hello from Caprecon API"})
+_CONSTANT_HEADERS = {"Cache-Control": "public, max-age=60"}
+
 @app.get("/")
-def read_root():
-    return {"message": "Caprecon Backend Running"}
+async def read_root():
+    return Response(_ROOT, media_type="application/json", headers=_CONSTANT_HEADERS)
 
 @app.get("/api/hello")
-def hello():
-    return {"message": "Hello from Caprecon API"}
+async def hello():
+    return Response(_HELLO, media_type="application/json", headers=_CONSTANT_HEADERS)
 
-@app.get("/test")
-def test_database():
-    """Test endpoint to check if database is available and accessible"""
+# listCollections is a server round-trip, so probe results are reused for a short while
+HEALTH_CACHE_TTL = 30
+_health_cache = {"ts": 0.0, "val": None}
+_health_lock = asyncio.Lock()
+
+def _health_fresh() -> bool:
+    return _health_cache["val"] is not None and time.monotonic() - _health_cache["ts"] < HEALTH_CACHE_TTL
+
+async def _check_database() -> dict:
+    db = app.state.mongo
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -47,11 +102,11 @@ def test_database():
     try:
         if db is not None:
             response["database"] = "✅ Available"
-            response["database_url"] = "✅ Set" if os.getenv("DATABASE_URL") else "❌ Not Set"
+            response["database_url"] = "✅ Set" if settings().database_url else "❌ Not Set"
             response["database_name"] = db.name if hasattr(db, 'name') else "✅ Connected"
             response["connection_status"] = "Connected"
             try:
-                collections = db.list_collection_names()
+                collections = await db.list_collection_names()
                 response["collections"] = collections[:20]
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
@@ -62,75 +117,187 @@ def test_database():
         response["database"] = f"❌ Error: {str(e)[:120]}"
     return response
 
+@app.get("/test")
+async def test_database(refresh: bool = False):
+    """Test endpoint to check if database is available and accessible (cached for 30s, ?refresh=1 to re-check)"""
+    if not refresh and _health_fresh():
+        return _health_cache["val"]
+    async with _health_lock:
+        # A concurrent probe may have refreshed the result while we waited for the lock
+        if refresh or not _health_fresh():
+            _health_cache["val"] = await _check_database()
+            _health_cache["ts"] = time.monotonic()
+    return _health_cache["val"]
+
 # -------- Public content listing endpoints --------
 
-@app.get("/api/programs", response_model=List[Program])
-def list_programs(limit: Optional[int] = 20, published_only: bool = True):
-    filter_q = {}
-    if published_only:
-        filter_q["status"] = "published"
-    docs = get_documents("program", filter_q, limit)
-    # Remove Mongo _id for Pydantic validation simplicity
-    for d in docs:
-        d.pop("_id", None)
-    return docs
-
-@app.get("/api/stories", response_model=List[Story])
-def list_stories(limit: Optional[int] = 12, published_only: bool = True):
-    filter_q = {"status": "published"} if published_only else {}
-    docs = get_documents("story", filter_q, limit)
-    for d in docs:
-        d.pop("_id", None)
-    return docs
-
-@app.get("/api/posts", response_model=List[Post])
-def list_posts(limit: Optional[int] = 12, published_only: bool = True):
-    filter_q = {"status": "published"} if published_only else {}
-    docs = get_documents("post", filter_q, limit)
-    for d in docs:
-        d.pop("_id", None)
-    return docs
+# Published content changes rarely, so listings are served from Redis for a few seconds
+LISTING_CACHE_TTL = 10
+
+# Published listings read newest-first through a {status, _id} index instead of scanning the
+# collection; the planner picks it on its own, so a missing index only costs speed
+LISTING_COLLECTIONS = ("program", "story", "post")
+PUBLISHED_INDEX = [("status", 1), ("_id", -1)]
+NEWEST_FIRST = [("_id", -1)]
+
+# Caps cursor size, validation work and cached body size per listing request
+MAX_LISTING_LIMIT = 100
+
+# Shared filters so listings don't build a dict per request. Plain dicts, because pymongo
+# copies the filter when a sort is applied and a mappingproxy can't be copied; treat as read-only.
+_PUBLISHED_FILTER = {"status": "published"}
+_ALL_FILTER = {}
+
+# Built once at import so each request reuses the compiled validator/serializer
+PROGRAM_LIST_ADAPTER = TypeAdapter(List[Program])
+STORY_LIST_ADAPTER = TypeAdapter(List[Story])
+POST_LIST_ADAPTER = TypeAdapter(List[Post])
+
+def model_projection(model: Type[BaseModel]) -> dict:
+    """Fetch only the fields a model declares, leaving out _id"""
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+PROGRAM_PROJECTION = model_projection(Program)
+STORY_PROJECTION = model_projection(Story)
+POST_PROJECTION = model_projection(Post)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header lists `etag` (weak comparison, so W/ prefixes are ignored)"""
+    if not if_none_match:
+        return False
+    candidates = {c.strip().removeprefix("W/") for c in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates or "*" in candidates
+
+async def cached_listing(request: Request, key: str, collection_name: str, adapter: TypeAdapter, projection: dict, filter_q: dict, limit: int):
+    """Serve a listing from the response cache, falling back to MongoDB on a miss; honours If-None-Match"""
+    body = await cache_get(key)
+    if body is None:
+        try:
+            docs = await get_documents_async(
+                collection_name,
+                filter_q,
+                limit,
+                projection=projection,
+                sort=NEWEST_FIRST,
+            )
+        except Exception:
+            # Serve the last known listing while MongoDB is unavailable
+            body = await cache_get_stale(key)
+            if body is None:
+                raise
+        else:
+            body = adapter.dump_json(adapter.validate_python(docs), by_alias=True)
+            await cache_set(key, body, LISTING_CACHE_TTL)
+    # Hashing is cheap next to serialization, so cached bodies are re-hashed rather than storing the tag
+    # Weak, because GZipMiddleware may send the same tag for a differently encoded body
+    etag = f'W/"{xxhash.xxh3_64_hexdigest(body)}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+@app.get("/api/programs", responses={200: {"model": List[Program]}})
+async def list_programs(request: Request, limit: int = Query(20, ge=1, le=MAX_LISTING_LIMIT), published_only: bool = True):
+    filter_q = _PUBLISHED_FILTER if published_only else _ALL_FILTER
+    key = cache_key("/api/programs", limit=limit, published_only=published_only)
+    return await cached_listing(request, key, "program", PROGRAM_LIST_ADAPTER, PROGRAM_PROJECTION, filter_q, limit)
+
+@app.get("/api/stories", responses={200: {"model": List[Story]}})
+async def list_stories(request: Request, limit: int = Query(12, ge=1, le=MAX_LISTING_LIMIT), published_only: bool = True):
+    filter_q = _PUBLISHED_FILTER if published_only else _ALL_FILTER
+    key = cache_key("/api/stories", limit=limit, published_only=published_only)
+    return await cached_listing(request, key, "story", STORY_LIST_ADAPTER, STORY_PROJECTION, filter_q, limit)
+
+@app.get("/api/posts", responses={200: {"model": List[Post]}})
+async def list_posts(request: Request, limit: int = Query(12, ge=1, le=MAX_LISTING_LIMIT), published_only: bool = True):
+    filter_q = _PUBLISHED_FILTER if published_only else _ALL_FILTER
+    key = cache_key("/api/posts", limit=limit, published_only=published_only)
+    return await cached_listing(request, key, "post", POST_LIST_ADAPTER, POST_PROJECTION, filter_q, limit)
 
 # -------- Intake / Forms endpoints --------
 
+# Documents the POST response shape in OpenAPI; handlers return ORJSONResponse directly
+# so FastAPI doesn't re-validate the dict through the model
 class Created(BaseModel):
     id: str
     message: str
 
-@app.post("/api/donations", response_model=Created)
-def create_donation(intent: DonationIntent):
+@app.post("/api/donations", responses={200: {"model": Created}})
+async def create_donation(intent: DonationIntent):
+    try:
+        inserted_id = await submit_intake("donationintent", intent)
+        return ORJSONResponse({"id": inserted_id, "message": "Donation intent recorded"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/volunteers", responses={200: {"model": Created}})
+async def create_volunteer(apply: VolunteerApplication):
+    try:
+        inserted_id = await submit_intake("volunteerapplication", apply)
+        return ORJSONResponse({"id": inserted_id, "message": "Volunteer application received"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/partners", responses={200: {"model": Created}})
+async def create_partner(inquiry: PartnerInquiry):
+    try:
+        inserted_id = await submit_intake("partnerinquiry", inquiry)
+        return ORJSONResponse({"id": inserted_id, "message": "Partner inquiry submitted"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/contact", responses={200: {"model": Created}})
+async def create_contact(msg: ContactMessage):
+    try:
+        inserted_id = await submit_intake("contactmessage", msg)
+        return ORJSONResponse({"id": inserted_id, "message": "Message received"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# -------- Bulk intake endpoints --------
+
+# Upper bound on documents accepted per bulk request (enforced by Body, since FastAPI
+# drops conlist constraints on a top-level list body)
+BULK_MAX_ITEMS = 500
+
+class CreatedBulk(BaseModel):
+    ids: List[str]
+    message: str
+
+@app.post("/api/donations/bulk", responses={200: {"model": CreatedBulk}})
+async def create_donations(intents: Annotated[List[DonationIntent], Body(min_length=1, max_length=BULK_MAX_ITEMS)]):
     try:
-        inserted_id = create_document("donationintent", intent)
-        return {"id": inserted_id, "message": "Donation intent recorded"}
+        inserted_ids = await create_documents_async("donationintent", intents)
+        return ORJSONResponse({"ids": inserted_ids, "message": "Donation intents recorded"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/volunteers", response_model=Created)
-def create_volunteer(apply: VolunteerApplication):
+@app.post("/api/volunteers/bulk", responses={200: {"model": CreatedBulk}})
+async def create_volunteers(applications: Annotated[List[VolunteerApplication], Body(min_length=1, max_length=BULK_MAX_ITEMS)]):
     try:
-        inserted_id = create_document("volunteerapplication", apply)
-        return {"id": inserted_id, "message": "Volunteer application received"}
+        inserted_ids = await create_documents_async("volunteerapplication", applications)
+        return ORJSONResponse({"ids": inserted_ids, "message": "Volunteer applications received"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/partners", response_model=Created)
-def create_partner(inquiry: PartnerInquiry):
+@app.post("/api/partners/bulk", responses={200: {"model": CreatedBulk}})
+async def create_partners(inquiries: Annotated[List[PartnerInquiry], Body(min_length=1, max_length=BULK_MAX_ITEMS)]):
     try:
-        inserted_id = create_document("partnerinquiry", inquiry)
-        return {"id": inserted_id, "message": "Partner inquiry submitted"}
+        inserted_ids = await create_documents_async("partnerinquiry", inquiries)
+        return ORJSONResponse({"ids": inserted_ids, "message": "Partner inquiries submitted"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/contact", response_model=Created)
-def create_contact(msg: ContactMessage):
+@app.post("/api/contact/bulk", responses={200: {"model": CreatedBulk}})
+async def create_contacts(msgs: Annotated[List[ContactMessage], Body(min_length=1, max_length=BULK_MAX_ITEMS)]):
     try:
-        inserted_id = create_document("contactmessage", msg)
-        return {"id": inserted_id, "message": "Message received"}
+        inserted_ids = await create_documents_async("contactmessage", msgs)
+        return ORJSONResponse({"ids": inserted_ids, "message": "Messages received"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 if __name__ == "__main__":
     import uvicorn
-    port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # An import string is required for workers > 1
+    uvicorn.run("main:app", host="0.0.0.0", port=settings().port, workers=settings().workers, loop="uvloop", http="httptools")
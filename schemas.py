@@ -6,11 +6,47 @@ Collection name is the lowercase of the class name.
 
 Content-oriented collections support publishing workflows via optional status fields.
 """
-from typing import Optional, List, Literal
-from pydantic import BaseModel, Field, EmailStr
+from enum import StrEnum
+from typing import Annotated, Optional, List
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, StringConstraints
+
+from config import settings
+
+# Shape-only email check compiled into pydantic-core; set STRICT_EMAIL_VALIDATION=1
+# to fall back to the full RFC 5321 check done by email-validator.
+EMAIL_RE = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+if settings().strict_email_validation:
+    Email = EmailStr
+else:
+    Email = Annotated[str, StringConstraints(strip_whitespace=True, max_length=254, pattern=EMAIL_RE)]
+
+# Workflow states; enum members validate by identity and are stored as plain strings
+# (use_enum_values). Defaults are the plain string values, since defaults aren't validated.
+class ContentStatus(StrEnum):
+    draft = 'draft'
+    published = 'published'
+
+class DonationFrequency(StrEnum):
+    one_time = 'one_time'
+    monthly = 'monthly'
+
+class VolunteerStatus(StrEnum):
+    received = 'received'
+    screening = 'screening'
+    accepted = 'accepted'
+    declined = 'declined'
+
+class PartnerStatus(StrEnum):
+    received = 'received'
+    in_discussion = 'in_discussion'
+    mou_draft = 'mou_draft'
+    closed = 'closed'
 
 # Core content types
 class Program(BaseModel):
+    # Listings validate raw Mongo documents; unknown fields such as _id are dropped
+    model_config = ConfigDict(extra='ignore', defer_build=False, use_enum_values=True)
+
     title: str = Field(..., description="Program title")
     summary: str = Field(..., description="Short description for cards and previews")
     problem_context: Optional[str] = Field(None, description="Context of the issue this program addresses")
@@ -20,49 +56,59 @@ class Program(BaseModel):
     expected_impact: Optional[str] = Field(None, description="Expected outcomes and indicators")
     locations: Optional[List[str]] = Field(default_factory=list, description="Operational locations")
     tags: Optional[List[str]] = Field(default_factory=list, description="Tags for filtering")
-    status: Optional[Literal['draft','published']] = Field('published', description="Publishing status")
+    status: Optional[ContentStatus] = Field('published', description="Publishing status")
 
 class Story(BaseModel):
+    model_config = ConfigDict(extra='ignore', defer_build=False, use_enum_values=True)
+
     title: str
     excerpt: Optional[str] = None
     body: Optional[str] = None
     program_tags: Optional[List[str]] = Field(default_factory=list)
     author: Optional[str] = None
     location: Optional[str] = None
-    status: Optional[Literal['draft','published']] = 'published'
+    status: Optional[ContentStatus] = 'published'
 
 class Post(BaseModel):
+    model_config = ConfigDict(extra='ignore', defer_build=False, use_enum_values=True)
+
     title: str
     excerpt: Optional[str] = None
     body: Optional[str] = None
     category: Optional[str] = None
     tags: Optional[List[str]] = Field(default_factory=list)
     author: Optional[str] = None
-    status: Optional[Literal['draft','published']] = 'published'
+    status: Optional[ContentStatus] = 'published'
 
 class Report(BaseModel):
+    model_config = ConfigDict(defer_build=False, use_enum_values=True)
+
     title: str
     description: Optional[str] = None
     year: Optional[int] = None
     file_url: Optional[str] = None
-    status: Optional[Literal['draft','published']] = 'published'
+    status: Optional[ContentStatus] = 'published'
 
 # Intake forms
 class DonationIntent(BaseModel):
+    model_config = ConfigDict(defer_build=False, use_enum_values=True)
+
     amount: float = Field(..., gt=0)
     currency: str = Field('USD', description='ISO currency code')
-    frequency: Literal['one_time','monthly'] = 'one_time'
+    frequency: DonationFrequency = 'one_time'
     fund: Optional[str] = Field(None, description='Restricted fund name')
     first_name: str
     last_name: str
-    email: EmailStr
+    email: Email
     country: Optional[str] = None
     message: Optional[str] = None
     consent: bool = Field(..., description='User consent for communications')
 
 class VolunteerApplication(BaseModel):
+    model_config = ConfigDict(defer_build=False, use_enum_values=True)
+
     name: str
-    email: EmailStr
+    email: Email
     phone: Optional[str] = None
     location: Optional[str] = None
     role_interest: Optional[str] = None
@@ -70,29 +116,35 @@ class VolunteerApplication(BaseModel):
     experience: Optional[str] = None
     references: Optional[str] = None
     consent: bool
-    status: Optional[Literal['received','screening','accepted','declined']] = 'received'
+    status: Optional[VolunteerStatus] = 'received'
 
 class PartnerInquiry(BaseModel):
+    model_config = ConfigDict(defer_build=False, use_enum_values=True)
+
     organization: str
     partner_type: Optional[str] = Field(None, description='NGO, agency, corporate, academic')
     contact_name: str
-    email: EmailStr
+    email: Email
     phone: Optional[str] = None
     country: Optional[str] = None
     collaboration_areas: Optional[str] = None
     message: Optional[str] = None
     compliance_ack: bool = Field(..., description='Acknowledgement of compliance statements')
-    status: Optional[Literal['received','in_discussion','mou_draft','closed']] = 'received'
+    status: Optional[PartnerStatus] = 'received'
 
 class ContactMessage(BaseModel):
+    model_config = ConfigDict(defer_build=False)
+
     topic: Optional[str] = None
     name: str
-    email: EmailStr
+    email: Email
     message: str
     consent: bool
 
 # Optional: KPI metric definition for future impact dashboard
 class Metric(BaseModel):
+    model_config = ConfigDict(defer_build=False)
+
     key: str
     label: str
     value: float
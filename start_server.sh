@@ -2,7 +2,7 @@
 echo "Starting FastAPI backend server..."
 
 # Find and kill MainThread processes
-PIDS=$(ps | grep uvicorn | grep -v grep | awk '{print $1}')
+PIDS=$(ps | grep -E 'uvicorn|main.py' | grep -v grep | awk '{print $1}')
 if [ ! -z "$PIDS" ]; then
   echo "Killing uvicorn processes: $PIDS"
   for pid in $PIDS; do
@@ -15,5 +15,7 @@ mkdir -p logs
 echo "Installing dependencies..."
 pip install -r requirements.txt
 echo "Starting FastAPI server..."
-nohup uvicorn main:app --host 0.0.0.0 --port 8000 --reload > logs/server.log 2>&1 
+# main.py runs uvicorn with WEB_CONCURRENCY workers (default 2*CPU+1), uvloop and httptools;
+# --reload is single-process, so it is not used here
+nohup python main.py > logs/server.log 2>&1 
 echo "Server started in background"